@@ -4,11 +4,20 @@ Handles conversation flow, SQLite database operations, and API endpoints.
 """
 
 import os
+import queue
+import secrets
 import sqlite3
-import uuid
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime, date
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Union
+import msgpack
+import orjson
+import redis
+from cachetools import TTLCache
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import JSONProvider
+from rapidfuzz import fuzz, process
 
 # Import NLP utilities - replace with your preferred NLP library if needed
 try:
@@ -18,15 +27,66 @@ except ImportError as e:
     print("Please ensure nlp_utils.py is in the same directory and dependencies are installed.")
     exit(1)
 
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson. Flask routes jsonify() and request.get_json()
+    through app.json, so both use it. Extra json-module kwargs are ignored.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # orjson already produces UTF-8 bytes, so skip the str round-trip of dumps()
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Configuration
 DATABASE_PATH = 'bookings.db'
 SESSION_TIMEOUT = 3600  # 1 hour in seconds
-
-# In-memory session storage: {session_id: conversation_state}
-# For production, consider using Redis or another persistent store
-active_sessions: Dict[str, Dict[str, Any]] = {}
+MAX_SESSIONS = 10000  # Cap on in-memory sessions; least recently used are evicted first
+REDIS_URL = os.environ.get('REDIS_URL')  # e.g. redis://localhost:6379/0 - unset keeps sessions in-process
+BOOKING_BATCH_SIZE = 64  # Max bookings committed together by the writer thread
+BOOKING_WRITE_TIMEOUT = 10  # Seconds a confirmation waits for its booking to be committed
+
+# Accepted payment methods and common shorthands that map straight to one of them
+VALID_PAYMENT_METHODS = ['credit card', 'debit card', 'cash', 'paypal']
+PAYMENT_ALIASES = {
+    **{method: method for method in VALID_PAYMENT_METHODS},
+    'cc': 'credit card', 'credit': 'credit card', 'visa': 'credit card',
+    'mastercard': 'credit card', 'amex': 'credit card',
+    'dc': 'debit card', 'debit': 'debit card',
+    'pp': 'paypal', 'pay pal': 'paypal',
+}
+
+# Session storage: Redis when REDIS_URL is set, so every worker process sees the same
+# conversations and they survive restarts; otherwise a bounded in-memory cache.
+# In-memory layout: {session_id: conversation_state}, entries expire SESSION_TIMEOUT
+# seconds after their last save. TTLCache isn't thread-safe, so access goes through a lock.
+active_sessions: 'TTLCache[str, Dict[str, Any]]' = TTLCache(maxsize=MAX_SESSIONS, ttl=SESSION_TIMEOUT)
+_sessions_lock = threading.Lock()
+_redis = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+SESSION_KEY_PREFIX = 'hotel_chat:session:'
+
+# Shared SQLite connection, opened once per process and reused for every query.
+# WAL journaling lets readers run alongside the writer and, with synchronous=NORMAL,
+# avoids an fsync on every commit. Writes are serialized through _DB_LOCK.
+_CONN = sqlite3.connect(DATABASE_PATH, check_same_thread=False, isolation_level=None)
+_CONN.execute('PRAGMA journal_mode=WAL')
+_CONN.execute('PRAGMA synchronous=NORMAL')
+_CONN.execute('PRAGMA temp_store=MEMORY')
+_DB_LOCK = threading.Lock()
+
+# Pending booking writes: (session_id, booking_data, future resolved with the saved record)
+_booking_queue: 'queue.Queue[Tuple[str, Dict[str, Any], Future]]' = queue.Queue()
 
 
 def init_database() -> None:
@@ -34,32 +94,28 @@ def init_database() -> None:
     Initialize SQLite database and create bookings table if it doesn't exist.
     Call this on app startup to ensure database schema is ready.
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
     # Create bookings table with all required fields
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS bookings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            checkin TEXT NOT NULL,
-            checkout TEXT NOT NULL,
-            guests INTEGER NOT NULL,
-            breakfast BOOLEAN DEFAULT 0,
-            payment_method TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    conn.commit()
-    conn.close()
+    with _DB_LOCK:
+        _CONN.execute('''
+            CREATE TABLE IF NOT EXISTS bookings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                checkin TEXT NOT NULL,
+                checkout TEXT NOT NULL,
+                guests INTEGER NOT NULL,
+                breakfast BOOLEAN DEFAULT 0,
+                payment_method TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
     print(f"Database initialized at: {os.path.abspath(DATABASE_PATH)}")
 
 
-def save_booking_to_db(session_id: str, booking_data: Dict[str, Any]) -> Dict[str, Any]:
+def _insert_booking(session_id: str, booking_data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Save completed booking to SQLite database.
+    Insert a single booking on the shared connection. Caller must hold _DB_LOCK.
 
     Args:
         session_id: Unique session identifier
@@ -68,13 +124,11 @@ def save_booking_to_db(session_id: str, booking_data: Dict[str, Any]) -> Dict[st
     Returns:
         Dictionary with booking record including database ID
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    # Insert booking record
-    cursor.execute('''
+    # Insert booking record and read back the generated id and timestamp in one statement
+    booking_id, created_at = _CONN.execute('''
         INSERT INTO bookings (session_id, name, checkin, checkout, guests, breakfast, payment_method)
         VALUES (?, ?, ?, ?, ?, ?, ?)
+        RETURNING id, created_at
     ''', (
         session_id,
         booking_data['name'],
@@ -83,35 +137,155 @@ def save_booking_to_db(session_id: str, booking_data: Dict[str, Any]) -> Dict[st
         booking_data['guests'],
         booking_data.get('breakfast', False),
         booking_data.get('payment_method', 'Not specified')
-    ))
+    )).fetchone()
+
+    return {
+        'id': booking_id,
+        'session_id': session_id,
+        'name': booking_data['name'],
+        'checkin': booking_data['checkin_date'],
+        'checkout': booking_data['checkout_date'],
+        'guests': booking_data['guests'],
+        'breakfast': bool(booking_data.get('breakfast', False)),
+        'payment_method': booking_data.get('payment_method', 'Not specified'),
+        'created_at': created_at
+    }
 
-    booking_id = cursor.lastrowid
-    conn.commit()
 
-    # Retrieve the complete record with timestamp
-    cursor.execute('SELECT * FROM bookings WHERE id = ?', (booking_id,))
-    record = cursor.fetchone()
-    conn.close()
+def _write_booking_batch(batch: list) -> None:
+    """
+    Insert a batch of queued bookings in one transaction and resolve their futures.
+    Caller must hold _DB_LOCK.
+    """
+    # Claim each booking before writing it; ones whose caller already gave up are skipped
+    batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+    if not batch:
+        return
+
+    try:
+        _CONN.execute('BEGIN')
+        records = [_insert_booking(session_id, data) for session_id, data, _ in batch]
+        _CONN.execute('COMMIT')
+    except Exception:
+        if _CONN.in_transaction:
+            _CONN.execute('ROLLBACK')
+        records = None
+
+    if records is not None:
+        for (_, _, future), record in zip(batch, records):
+            future.set_result(record)
+        return
+
+    # Batch failed - retry one by one so a single bad booking doesn't fail the rest
+    for session_id, data, future in batch:
+        try:
+            future.set_result(_insert_booking(session_id, data))
+        except Exception as e:
+            future.set_exception(e)
+
+
+def _booking_writer() -> None:
+    """
+    Background writer: drain queued bookings and commit each batch in one transaction,
+    so concurrent confirmations share a single WAL commit instead of paying one each.
+    Errors are reported to the waiting callers; the loop itself never exits.
+    """
+    while True:
+        batch = [_booking_queue.get()]
+        while len(batch) < BOOKING_BATCH_SIZE:
+            try:
+                batch.append(_booking_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            with _DB_LOCK:
+                _write_booking_batch(batch)
+        except Exception as e:
+            print(f"Booking writer error: {e}")
+            # Don't leave a half-finished transaction behind for the next batch
+            try:
+                if _CONN.in_transaction:
+                    _CONN.execute('ROLLBACK')
+            except Exception:
+                pass
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+def save_booking_to_db(session_id: str, booking_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Save completed booking to SQLite database.
+
+    The insert is handed to the background writer thread, which groups it with
+    other pending bookings; this call blocks until the batch is committed. If the
+    writer hasn't picked the booking up within BOOKING_WRITE_TIMEOUT seconds, the
+    write is withdrawn and TimeoutError is raised, so nothing is saved.
+
+    Args:
+        session_id: Unique session identifier
+        booking_data: Dictionary containing booking information
+
+    Returns:
+        Dictionary with booking record including database ID
+    """
+    future: Future = Future()
+    _booking_queue.put((session_id, booking_data, future))
+    try:
+        return future.result(timeout=BOOKING_WRITE_TIMEOUT)
+    except FutureTimeoutError:
+        # Withdraw the booking if the writer hasn't started on it yet
+        if future.cancel():
+            raise
+        # Already being written - wait for the outcome rather than report a false failure
+        return future.result()
 
-    # Convert database row to dictionary
-    if record:
-        return {
-            'id': record[0],
-            'session_id': record[1],
-            'name': record[2],
-            'checkin': record[3],
-            'checkout': record[4],
-            'guests': record[5],
-            'breakfast': bool(record[6]),
-            'payment_method': record[7],
-            'created_at': record[8]
-        }
-    return {}
+
+threading.Thread(target=_booking_writer, name='booking-writer', daemon=True).start()
+
+# Ensure the schema exists in every process that serves requests - the development
+# server below as well as each WSGI worker (see gunicorn.conf.py)
+init_database()
+
+
+def load_session(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Load conversation state from the session store.
+
+    Args:
+        session_id: Session identifier
+
+    Returns:
+        Session state, or None if the session doesn't exist or has expired
+    """
+    if _redis is None:
+        with _sessions_lock:
+            return active_sessions.get(session_id)
+
+    raw = _redis.get(SESSION_KEY_PREFIX + session_id)
+    return msgpack.unpackb(raw) if raw else None
+
+
+def save_session(session_id: str, session_state: Dict[str, Any]) -> None:
+    """
+    Store conversation state, refreshing its expiry (SESSION_TIMEOUT).
+
+    Args:
+        session_id: Session identifier
+        session_state: Current session state
+    """
+    if _redis is None:
+        with _sessions_lock:
+            active_sessions[session_id] = session_state
+    else:
+        _redis.setex(SESSION_KEY_PREFIX + session_id, SESSION_TIMEOUT, msgpack.packb(session_state))
 
 
 def get_or_create_session(session_id: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
     """
     Get existing session or create new one.
+    New sessions are persisted by the caller via save_session() once the message is processed.
 
     Args:
         session_id: Optional existing session ID
@@ -119,164 +293,163 @@ def get_or_create_session(session_id: Optional[str] = None) -> Tuple[str, Dict[s
     Returns:
         Tuple of (session_id, session_state)
     """
-    if session_id and session_id in active_sessions:
-        return session_id, active_sessions[session_id]
+    # Only strings are valid ids - anything else from the client starts a new session
+    if isinstance(session_id, str) and session_id:
+        session_state = load_session(session_id)
+        if session_state is not None:
+            return session_id, session_state
 
     # Create new session
-    new_session_id = str(uuid.uuid4())
+    new_session_id = secrets.token_urlsafe(16)  # 128 random bits, 22 URL-safe characters
     session_state = {
         'step': 'name',  # Current conversation step
         'data': {},      # Collected booking data
         'created_at': datetime.now().isoformat()
     }
 
-    active_sessions[new_session_id] = session_state
     return new_session_id, session_state
 
 
-def process_conversation_step(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
-    """
-    Process user message based on current conversation step.
+# Conversation step handlers. Each takes (session_state, user_message), may advance
+# session_state['step'], and returns the reply dict for that message.
 
-    Args:
-        session_state: Current session state
-        user_message: User's input message
+def _handle_name(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """Step 1: Collect name."""
+    name = extract_name(user_message)
+    if name:
+        session_state['data']['name'] = name
+        session_state['step'] = 'checkin'
+        return {
+            'reply': f"Nice to meet you, {name}! When would you like to check in? (e.g., 'tomorrow', 'January 15th', '2024-01-15')",
+            'complete': False,
+            'booking': None
+        }
+    else:
+        return {
+            'reply': "I didn't catch your name. Could you please tell me your name?",
+            'complete': False,
+            'booking': None
+        }
 
-    Returns:
-        Dictionary with reply, completion status, and booking data if complete
-    """
-    step = session_state['step']
-    data = session_state['data']
 
-    # Step 1: Collect name
-    if step == 'name':
-        name = extract_name(user_message)
-        if name:
-            data['name'] = name
-            session_state['step'] = 'checkin'
-            return {
-                'reply': f"Nice to meet you, {name}! When would you like to check in? (e.g., 'tomorrow', 'January 15th', '2024-01-15')",
-                'complete': False,
-                'booking': None
-            }
-        else:
-            return {
-                'reply': "I didn't catch your name. Could you please tell me your name?",
-                'complete': False,
-                'booking': None
-            }
+def _handle_checkin(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """Step 2: Collect check-in date."""
+    checkin_date = parse_date(user_message, prefer_future=True)
+    if checkin_date:
+        session_state['data']['checkin_date'] = checkin_date
+        session_state['step'] = 'checkout'
+        return {
+            'reply': f"Great! Check-in on {checkin_date}. When would you like to check out?",
+            'complete': False,
+            'booking': None
+        }
+    else:
+        return {
+            'reply': "I couldn't understand the date. Please provide your check-in date (e.g., 'tomorrow', 'January 15th', or '2024-01-15')",
+            'complete': False,
+            'booking': None
+        }
+
 
-    # Step 2: Collect check-in date
-    elif step == 'checkin':
-        checkin_date = parse_date(user_message, prefer_future=True)
-        if checkin_date:
-            data['checkin_date'] = checkin_date
-            session_state['step'] = 'checkout'
+def _handle_checkout(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """Step 3: Collect check-out date."""
+    data = session_state['data']
+    checkout_date = parse_date(user_message, prefer_future=True)
+    if checkout_date:
+        # Validate that checkout is after checkin
+        if validate_date_order(data['checkin_date'], checkout_date):
+            data['checkout_date'] = checkout_date
+            session_state['step'] = 'guests'
             return {
-                'reply': f"Great! Check-in on {checkin_date}. When would you like to check out?",
+                'reply': f"Perfect! Check-out on {checkout_date}. How many guests will be staying?",
                 'complete': False,
                 'booking': None
             }
         else:
             return {
-                'reply': "I couldn't understand the date. Please provide your check-in date (e.g., 'tomorrow', 'January 15th', or '2024-01-15')",
+                'reply': f"Check-out date must be after check-in date ({data['checkin_date']}). Please provide a later check-out date.",
                 'complete': False,
                 'booking': None
             }
+    else:
+        return {
+            'reply': "I couldn't understand the check-out date. Please provide a valid date.",
+            'complete': False,
+            'booking': None
+        }
 
-    # Step 3: Collect check-out date
-    elif step == 'checkout':
-        checkout_date = parse_date(user_message, prefer_future=True)
-        if checkout_date:
-            # Validate that checkout is after checkin
-            if validate_date_order(data['checkin_date'], checkout_date):
-                data['checkout_date'] = checkout_date
-                session_state['step'] = 'guests'
-                return {
-                    'reply': f"Perfect! Check-out on {checkout_date}. How many guests will be staying?",
-                    'complete': False,
-                    'booking': None
-                }
-            else:
-                return {
-                    'reply': f"Check-out date must be after check-in date ({data['checkin_date']}). Please provide a later check-out date.",
-                    'complete': False,
-                    'booking': None
-                }
-        else:
-            return {
-                'reply': "I couldn't understand the check-out date. Please provide a valid date.",
-                'complete': False,
-                'booking': None
-            }
 
-    # Step 4: Collect number of guests
-    elif step == 'guests':
-        guests = parse_guests(user_message)
-        if guests:
-            data['guests'] = guests
-            session_state['step'] = 'breakfast'
-            guest_text = "guest" if guests == 1 else "guests"
-            return {
-                'reply': f"Noted: {guests} {guest_text}. Would you like to include breakfast? (yes/no)",
-                'complete': False,
-                'booking': None
-            }
-        else:
-            return {
-                'reply': "Please tell me the number of guests (1-10 people).",
-                'complete': False,
-                'booking': None
-            }
+def _handle_guests(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """Step 4: Collect number of guests."""
+    guests = parse_guests(user_message)
+    if guests:
+        session_state['data']['guests'] = guests
+        session_state['step'] = 'breakfast'
+        guest_text = "guest" if guests == 1 else "guests"
+        return {
+            'reply': f"Noted: {guests} {guest_text}. Would you like to include breakfast? (yes/no)",
+            'complete': False,
+            'booking': None
+        }
+    else:
+        return {
+            'reply': "Please tell me the number of guests (1-10 people).",
+            'complete': False,
+            'booking': None
+        }
+
+
+def _handle_breakfast(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """Step 5: Optional breakfast preference."""
+    breakfast_response = is_yes(user_message)
+    if breakfast_response is not None:
+        session_state['data']['breakfast'] = breakfast_response
+        session_state['step'] = 'payment'
+        breakfast_text = "with breakfast" if breakfast_response else "without breakfast"
+        return {
+            'reply': f"Excellent, {breakfast_text}! What's your preferred payment method? (credit card, debit card, cash, paypal, or 'skip')",
+            'complete': False,
+            'booking': None
+        }
+    else:
+        return {
+            'reply': "Please answer yes or no for breakfast preference.",
+            'complete': False,
+            'booking': None
+        }
 
-    # Step 5: Optional breakfast preference
-    elif step == 'breakfast':
-        breakfast_response = is_yes(user_message)
-        if breakfast_response is not None:
-            data['breakfast'] = breakfast_response
-            session_state['step'] = 'payment'
-            breakfast_text = "with breakfast" if breakfast_response else "without breakfast"
-            return {
-                'reply': f"Excellent, {breakfast_text}! What's your preferred payment method? (credit card, debit card, cash, paypal, or 'skip')",
-                'complete': False,
-                'booking': None
-            }
-        else:
-            return {
-                'reply': "Please answer yes or no for breakfast preference.",
-                'complete': False,
-                'booking': None
-            }
 
-    # Step 6: Optional payment method
-    elif step == 'payment':
-        payment_method = user_message.strip().lower()
+def _handle_payment(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """Step 6: Optional payment method."""
+    data = session_state['data']
+    payment_method = user_message.strip().lower()
 
-        # Allow skipping payment method
-        if payment_method in ['skip', 'later', 'none']:
-            data['payment_method'] = 'Not specified'
+    # Allow skipping payment method
+    if payment_method in ['skip', 'later', 'none']:
+        data['payment_method'] = 'Not specified'
+    else:
+        # Validate payment method: known alias, then unambiguous prefix, then fuzzy match
+        best_match = PAYMENT_ALIASES.get(payment_method)
+        if not best_match:
+            prefix_matches = [m for m in VALID_PAYMENT_METHODS if m.startswith(payment_method)]
+            if len(prefix_matches) == 1:
+                best_match = prefix_matches[0]
+        if not best_match:
+            # Lower threshold for flexibility
+            match = process.extractOne(payment_method, VALID_PAYMENT_METHODS,
+                                       scorer=fuzz.ratio, score_cutoff=60)
+            if match:
+                best_match = match[0]
+
+        if best_match:
+            data['payment_method'] = best_match.title()
         else:
-            # Validate payment method (basic fuzzy matching)
-            valid_methods = ['credit card', 'debit card', 'cash', 'paypal']
-            best_match = None
-            best_score = 0
-
-            for method in valid_methods:
-                from rapidfuzz import fuzz
-                score = fuzz.ratio(payment_method, method)
-                if score > best_score and score > 60:  # Lower threshold for flexibility
-                    best_score = score
-                    best_match = method
-
-            if best_match:
-                data['payment_method'] = best_match.title()
-            else:
-                data['payment_method'] = payment_method.title()
-
-        session_state['step'] = 'confirm'
-
-        # Generate booking summary
-        summary = f"""
+            data['payment_method'] = payment_method.title()
+
+    session_state['step'] = 'confirm'
+
+    # Generate booking summary
+    summary = f"""
 Please confirm your booking details:
 
 • Name: {data['name']}
@@ -288,56 +461,86 @@ Please confirm your booking details:
 
 Type 'confirm' to complete your booking or 'cancel' to start over.
 """
-        return {
-            'reply': summary.strip(),
-            'complete': False,
-            'booking': None
-        }
+    return {
+        'reply': summary.strip(),
+        'complete': False,
+        'booking': None
+    }
 
-    # Step 7: Final confirmation
-    elif step == 'confirm':
-        response = user_message.lower().strip()
 
-        if response in ['confirm', 'yes', 'book', 'book it', 'proceed']:
-            # Save to database and complete booking
-            booking_record = save_booking_to_db(session_state.get('session_id', ''), data)
+def _handle_confirm(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """Step 7: Final confirmation."""
+    data = session_state['data']
+    response = user_message.lower().strip()
 
-            # Mark session as complete
-            session_state['step'] = 'complete'
+    if response in ['confirm', 'yes', 'book', 'book it', 'proceed']:
+        # Save to database and complete booking
+        booking_record = save_booking_to_db(session_state.get('session_id', ''), data)
 
-            return {
-                'reply': f"🎉 Booking confirmed! Your reservation ID is #{booking_record['id']}. Thank you for choosing our hotel!",
-                'complete': True,
-                'booking': booking_record
-            }
-
-        elif response in ['cancel', 'no', 'restart', 'start over']:
-            # Reset session
-            session_state['step'] = 'name'
-            session_state['data'] = {}
-            return {
-                'reply': "Booking cancelled. Let's start over! What's your name?",
-                'complete': False,
-                'booking': None
-            }
+        # Mark session as complete
+        session_state['step'] = 'complete'
 
-        else:
-            return {
-                'reply': "Please type 'confirm' to complete your booking or 'cancel' to start over.",
-                'complete': False,
-                'booking': None
-            }
+        return {
+            'reply': f"🎉 Booking confirmed! Your reservation ID is #{booking_record['id']}. Thank you for choosing our hotel!",
+            'complete': True,
+            'booking': booking_record
+        }
 
-    # Default case - should not reach here in normal flow
-    else:
+    elif response in ['cancel', 'no', 'restart', 'start over']:
+        # Reset session
         session_state['step'] = 'name'
         session_state['data'] = {}
         return {
-            'reply': "Let's start over! What's your name?",
+            'reply': "Booking cancelled. Let's start over! What's your name?",
             'complete': False,
             'booking': None
         }
 
+    else:
+        return {
+            'reply': "Please type 'confirm' to complete your booking or 'cancel' to start over.",
+            'complete': False,
+            'booking': None
+        }
+
+
+def _handle_restart(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """Unknown or finished step - reset the conversation."""
+    session_state['step'] = 'name'
+    session_state['data'] = {}
+    return {
+        'reply': "Let's start over! What's your name?",
+        'complete': False,
+        'booking': None
+    }
+
+
+_STEP_HANDLERS = {
+    'name': _handle_name,
+    'checkin': _handle_checkin,
+    'checkout': _handle_checkout,
+    'guests': _handle_guests,
+    'breakfast': _handle_breakfast,
+    'payment': _handle_payment,
+    'confirm': _handle_confirm,
+}
+
+
+def process_conversation_step(session_state: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """
+    Process user message based on current conversation step.
+
+    Args:
+        session_state: Current session state
+        user_message: User's input message
+
+    Returns:
+        Dictionary with reply, completion status, and booking data if complete
+    """
+    # Any other step (e.g. 'complete') starts the conversation over
+    handler = _STEP_HANDLERS.get(session_state['step'], _handle_restart)
+    return handler(session_state, user_message)
+
 
 @app.route('/')
 def index():
@@ -391,6 +594,7 @@ def chat_endpoint():
 
         # Process the conversation step
         response = process_conversation_step(session_state, user_message)
+        save_session(session_id, session_state)
         response['session_id'] = session_id
 
         return jsonify(response)
@@ -417,22 +621,16 @@ def internal_error(error):
 
 
 if __name__ == '__main__':
-    print("Initializing Hotel Booking Chatbot...")
-
-    # Initialize database on startup
-    try:
-        init_database()
-    except Exception as e:
-        print(f"Database initialization failed: {e}")
-        exit(1)
-
-    print("Starting Flask server...")
+    # Local development only - in production run under gunicorn instead:
+    #   gunicorn -c gunicorn.conf.py app:app
+    print("Starting Flask development server...")
     print("Visit: http://127.0.0.1:5000")
     print(f"Bookings will be saved to: {os.path.abspath(DATABASE_PATH)}")
 
     # Run Flask app (change host/port as needed)
     app.run(
-        debug=True,      # Set to False for production
+        debug=os.environ.get('FLASK_DEBUG') == '1',  # Opt in to the debugger/reloader
         host='127.0.0.1',
-        port=5000
+        port=5000,
+        threaded=True
     )
\ No newline at end of file
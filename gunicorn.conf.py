@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration for running the hotel booking chatbot in production.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+
+Settings can be overridden with environment variables (WEB_CONCURRENCY,
+GUNICORN_THREADS, GUNICORN_BIND) or on the command line.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:5000')
+
+# Sessions are only shared between processes through Redis (REDIS_URL). Without it,
+# stay on a single worker so every message of a conversation reaches the same process.
+if os.environ.get('REDIS_URL'):
+    default_workers = min(multiprocessing.cpu_count() * 2 + 1, 8)
+else:
+    default_workers = 1
+workers = int(os.environ.get('WEB_CONCURRENCY', default_workers))
+
+# Each worker serves requests from a thread pool - request handling mostly waits on
+# SQLite/Redis, so other threads keep running while one blocks.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Each worker must import the app itself: the SQLite connection and the booking
+# writer thread are created at import time and don't survive a fork.
+preload_app = False
+
+accesslog = '-'
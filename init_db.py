@@ -43,15 +43,10 @@ def create_database():
             )
         ''')
 
-        # Create index on session_id for faster queries
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_session_id ON bookings(session_id)
-        ''')
-
-        # Create index on created_at for chronological queries
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_created_at ON bookings(created_at)
-        ''')
+        # No secondary indexes: nothing queries by session_id or created_at, and each index
+        # costs an extra B-tree update per insert. Drop them from databases created earlier.
+        cursor.execute('DROP INDEX IF EXISTS idx_session_id')
+        cursor.execute('DROP INDEX IF EXISTS idx_created_at')
 
         # Commit changes
         conn.commit()
@@ -110,12 +105,10 @@ def add_sample_data():
             }
         ]
 
-        # Insert sample data
-        for booking in sample_bookings:
-            cursor.execute('''
-                INSERT INTO bookings (session_id, name, checkin, checkout, guests, breakfast, payment_method)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+        # Insert sample data in one executemany call; the sqlite3 module opens a single
+        # transaction for it, committed below
+        rows = [
+            (
                 booking['session_id'],
                 booking['name'],
                 booking['checkin'],
@@ -123,7 +116,13 @@ def add_sample_data():
                 booking['guests'],
                 booking['breakfast'],
                 booking['payment_method']
-            ))
+            )
+            for booking in sample_bookings
+        ]
+        cursor.executemany('''
+            INSERT INTO bookings (session_id, name, checkin, checkout, guests, breakfast, payment_method)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
 
         conn.commit()
         conn.close()
@@ -151,11 +150,11 @@ def view_bookings():
         conn = sqlite3.connect(DATABASE_PATH)
         cursor = conn.cursor()
 
-        # Get all bookings ordered by creation date
+        # Get all bookings, newest first (AUTOINCREMENT ids follow creation order)
         cursor.execute('''
             SELECT id, session_id, name, checkin, checkout, guests, breakfast, payment_method, created_at
             FROM bookings
-            ORDER BY created_at DESC
+            ORDER BY id DESC
         ''')
 
         bookings = cursor.fetchall()
@@ -3,27 +3,115 @@ NLP utility functions for hotel booking chatbot.
 Uses spaCy for name extraction and dateparser for date parsing.
 """
 
+import functools
+import importlib.util
 import re
-from datetime import datetime, date
+import threading
+from datetime import datetime, date, timedelta
 from typing import Optional, Union
-import spacy
 import dateparser
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
+# spaCy itself is imported lazily in _get_nlp(); only check that it's installed so a
+# missing dependency is still reported at startup
+if importlib.util.find_spec("spacy") is None:
+    raise ImportError("spaCy is not installed. Please run: pip install -r requirements.txt")
 
-# Load spaCy model - will raise error with helpful message if not installed
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    raise OSError(
-        "spaCy English model not found. Please install it by running:\n"
-        "python -m spacy download en_core_web_sm"
-    )
+
+# spaCy model, imported and loaded on first use by _get_nlp(). Most names are caught by
+# the regex fast path in extract_name(), so many worker processes never need spaCy at all.
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def _get_nlp():
+    """
+    Return the spaCy pipeline, importing spaCy and loading the model on first call.
+    Raises OSError with a helpful message if the model is not installed.
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+
+                # Only NER is used (PERSON entities), so the other components aren't loaded at all.
+                # NER has its own internal tok2vec; the shared one only feeds tagger/parser.
+                try:
+                    _nlp = spacy.load("en_core_web_sm",
+                                      exclude=["tok2vec", "tagger", "parser", "senter",
+                                               "attribute_ruler", "lemmatizer"])
+                except OSError:
+                    raise OSError(
+                        "spaCy English model not found. Please install it by running:\n"
+                        "python -m spacy download en_core_web_sm"
+                    )
+    return _nlp
+
+
+# Fast path for extract_name(): "My name is X", "I'm X Y", "Call me X", or just "X".
+# Only capitalized names that end the message are accepted here, so hyphenated,
+# apostrophe and longer names (or trailing text) fall through to spaCy. A bare reply
+# must be a single word - two words could be "Thanks Bob" or "Good Morning".
+_NAME_INTRO_RE = re.compile(
+    r"(?i:\b(?:my name is|i['’]?m|i am|this is|call me))\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s*[.!]?\s*$"
+)
+_BARE_NAME_RE = re.compile(r"([A-Z][a-z]+)[.!]?")
+
+# Structured date formats handled by parse_date(), with the matching strptime format
+_ISO_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')         # YYYY-MM-DD
+_DMY_SLASH_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')   # DD/MM/YYYY
+_DMY_DASH_RE = re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})')    # DD-MM-YYYY
+_DATE_PATTERNS = (
+    (_ISO_RE, '%Y-%m-%d'),
+    (_DMY_SLASH_RE, '%d/%m/%Y'),
+    (_DMY_DASH_RE, '%d-%m-%Y'),
+)
+
+# Canonical YYYY-MM-DD as produced by parse_date(); strings in this form sort chronologically
+_ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# Relative day words answered without dateparser: word -> offset from today
+_RELATIVE_DAYS = {'today': 0, 'tomorrow': 1, 'yesterday': -1}
+
+# First standalone number in the 1-10 range (reasonable range for hotel guests), leading zeros allowed
+_GUEST_COUNT_RE = re.compile(r'(?<!\d)0*(10|[1-9])(?!\d)')
+
+# Guest counts for parse_guests()
+_SINGLE_GUEST_INDICATORS = ('me', 'myself', 'just me', 'one person', 'solo', 'alone')
+_WORD_TO_NUM = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'a': 1, 'an': 1, 'single': 1, 'couple': 2, 'pair': 2
+}
+_WORD_TO_NUM_KEYS = tuple(_WORD_TO_NUM)
+_GUEST_FUZZY_MAX_WORDS = 3  # Longer replies aren't worth fuzzy matching word by word
+
+# Punctuation trimmed from the edges of words before matching them
+_PUNCT = '.,!?;:"()[]{}'
+
+# Common words that shouldn't be taken as names
+_NAME_SKIP_WORDS = frozenset({'I', 'My', 'Me', 'Hi', 'Hello', 'Hey', 'Sir', 'Madam', 'Mr', 'Mrs', 'Ms'})
+
+# Positive and negative response words used by is_yes()
+YES_WORDS = (
+    'yes', 'y', 'yeah', 'yep', 'yup', 'sure', 'ok', 'okay', 'alright',
+    'definitely', 'absolutely', 'certainly', 'of course', 'please',
+    'correct', 'right', 'true', 'confirm', 'agreed'
+)
+NO_WORDS = (
+    'no', 'n', 'nope', 'nah', 'not', 'never', 'none', 'negative',
+    'false', 'incorrect', 'wrong', 'disagree', 'refuse', 'decline'
+)
+# Single lookup table for exact hits and for mapping a fuzzy match back to yes/no
+_YES_NO = {**{word: True for word in YES_WORDS}, **{word: False for word in NO_WORDS}}
+_YES_NO_CHOICES = tuple(_YES_NO)
 
 
 def extract_name(text: str) -> Optional[str]:
     """
-    Extract person names from text using spaCy Named Entity Recognition.
+    Extract person names from text. Common introductions ("I'm X", "My name is X")
+    are matched with a regex; everything else goes through spaCy Named Entity Recognition.
 
     Args:
         text: Input text that may contain a person's name
@@ -34,12 +122,24 @@ def extract_name(text: str) -> Optional[str]:
     Examples:
         extract_name("Hi, I'm John Smith") -> "John Smith"
         extract_name("My name is Alice") -> "Alice"
+        extract_name("I'm Mary-Jane") -> "Mary-Jane" (via spaCy)
+        extract_name("I'm Sarah O'Connor") -> "Sarah O'Connor" (via spaCy)
+        extract_name("My name is Mary Ann Smith") -> "Mary Ann Smith" (via spaCy)
+        extract_name("Thanks Bob") -> "Bob" (via spaCy)
+        extract_name("John Smith") -> "John Smith" (via spaCy)
     """
     if not text or not text.strip():
         return None
 
+    text = text.strip()
+
+    # Try the common introduction patterns before running the spaCy pipeline
+    match = _NAME_INTRO_RE.search(text) or _BARE_NAME_RE.fullmatch(text)
+    if match and match.group(1).split()[0] not in _NAME_SKIP_WORDS:
+        return match.group(1)
+
     # Process text with spaCy NLP pipeline
-    doc = nlp(text.strip())
+    doc = _get_nlp()(text)
 
     # Look for PERSON entities first (most reliable)
     person_entities = [ent.text.strip() for ent in doc.ents if ent.label_ == "PERSON"]
@@ -47,16 +147,14 @@ def extract_name(text: str) -> Optional[str]:
         return person_entities[0]
 
     # Fallback: look for capitalized words that could be names
-    # Skip common words that shouldn't be names
-    skip_words = {'I', 'My', 'Me', 'Hi', 'Hello', 'Hey', 'Sir', 'Madam', 'Mr', 'Mrs', 'Ms'}
     words = text.split()
 
     for word in words:
         # Check if word is title case and not in skip list
-        clean_word = word.strip('.,!?;:"()[]{}')
+        clean_word = word.strip(_PUNCT)
         if (clean_word.istitle() and
             len(clean_word) > 1 and
-            clean_word not in skip_words and
+            clean_word not in _NAME_SKIP_WORDS and
             clean_word.isalpha()):
             return clean_word
 
@@ -79,46 +177,53 @@ def parse_date(text: str, prefer_future: bool = True) -> Optional[str]:
         parse_date("January 15th") -> "2024-01-15"
         parse_date("15/01/2024") -> "2024-01-15"
     """
+    # Relative inputs ("tomorrow", "next friday") depend on the current day, so it's part of the cache key
+    return _parse_date_cached(text, prefer_future, date.today().toordinal())
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_date_cached(text: str, prefer_future: bool, today_ordinal: int) -> Optional[str]:
+    """Cached implementation of parse_date(); today_ordinal only keys the cache."""
     if not text or not text.strip():
         return None
 
     clean_text = text.strip().lower()
 
+    # Relative day words are a simple offset from today
+    offset = _RELATIVE_DAYS.get(clean_text)
+    if offset is not None:
+        return (date.today() + timedelta(days=offset)).strftime('%Y-%m-%d')
+
+    # Try common date patterns with regex before the (much slower) dateparser
+    for pattern, date_format in _DATE_PATTERNS:
+        match = pattern.search(clean_text)
+        if match:
+            try:
+                parsed_date = datetime.strptime(match.group(), date_format)
+                return parsed_date.strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+
     # Configure dateparser settings
     settings = {
         'PREFER_DATES_FROM': 'future' if prefer_future else 'current_period',
         'RETURN_AS_TIMEZONE_AWARE': False,
-        'DATE_ORDER': 'DMY'  # Day-Month-Year (change to 'MDY' for US format)
+        # Day-Month-Year (change to 'MDY' for US format, and update _DATE_PATTERNS to match)
+        'DATE_ORDER': 'DMY'
     }
 
     try:
-        # Try dateparser first (handles most natural language)
-        parsed_date = dateparser.parse(clean_text, settings=settings)
+        # Fall back to dateparser for natural language ("next friday", "January 15th")
+        parsed_date = dateparser.parse(clean_text, languages=['en'], settings=settings)
         if parsed_date:
             return parsed_date.strftime('%Y-%m-%d')
-
-        # Fallback: try common date patterns with regex
-        date_patterns = [
-            (r'(\d{4})-(\d{1,2})-(\d{1,2})', '%Y-%m-%d'),  # ISO format
-            (r'(\d{1,2})/(\d{1,2})/(\d{4})', '%d/%m/%Y'),   # DD/MM/YYYY
-            (r'(\d{1,2})-(\d{1,2})-(\d{4})', '%d-%m-%Y'),   # DD-MM-YYYY
-        ]
-
-        for pattern, date_format in date_patterns:
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    parsed_date = datetime.strptime(match.group(), date_format)
-                    return parsed_date.strftime('%Y-%m-%d')
-                except ValueError:
-                    continue
-
     except Exception:
         pass
 
     return None
 
 
+@functools.lru_cache(maxsize=2048)
 def is_yes(text: str) -> Optional[bool]:
     """
     Determine if text indicates yes/no response using fuzzy matching.
@@ -139,37 +244,28 @@ def is_yes(text: str) -> Optional[bool]:
 
     text_lower = text.strip().lower()
 
-    # Define positive and negative response words
-    yes_words = [
-        'yes', 'y', 'yeah', 'yep', 'yup', 'sure', 'ok', 'okay', 'alright',
-        'definitely', 'absolutely', 'certainly', 'of course', 'please',
-        'correct', 'right', 'true', 'confirm', 'agreed'
-    ]
-
-    no_words = [
-        'no', 'n', 'nope', 'nah', 'not', 'never', 'none', 'negative',
-        'false', 'incorrect', 'wrong', 'disagree', 'refuse', 'decline'
-    ]
-
     # Check for exact matches first
-    if text_lower in yes_words:
-        return True
-    if text_lower in no_words:
-        return False
+    answer = _YES_NO.get(text_lower)
+    if answer is not None:
+        return answer
 
     # Use fuzzy matching for partial matches (threshold: 80%)
-    for word in yes_words:
-        if fuzz.ratio(text_lower, word) >= 80:
-            return True
-
-    for word in no_words:
-        if fuzz.ratio(text_lower, word) >= 80:
-            return False
-
-    # Check if text contains yes/no words
-    words = text_lower.split()
-    yes_count = sum(1 for word in words if any(fuzz.ratio(word, yes_word) >= 70 for yes_word in yes_words))
-    no_count = sum(1 for word in words if any(fuzz.ratio(word, no_word) >= 70 for no_word in no_words))
+    match = process.extractOne(text_lower, _YES_NO_CHOICES, scorer=fuzz.ratio, score_cutoff=80)
+    if match:
+        return _YES_NO[match[0]]
+
+    # Check if text contains yes/no words (threshold: 70% per word)
+    yes_count = no_count = 0
+    for word in text_lower.split():
+        answer = _YES_NO.get(word)
+        if answer is None:
+            match = process.extractOne(word, _YES_NO_CHOICES, scorer=fuzz.ratio, score_cutoff=70)
+            if match:
+                answer = _YES_NO[match[0]]
+        if answer is True:
+            yes_count += 1
+        elif answer is False:
+            no_count += 1
 
     if yes_count > no_count:
         return True
@@ -179,6 +275,7 @@ def is_yes(text: str) -> Optional[bool]:
     return None  # Unclear response
 
 
+@functools.lru_cache(maxsize=2048)
 def parse_guests(text: str) -> Optional[int]:
     """
     Extract number of guests from text.
@@ -200,39 +297,26 @@ def parse_guests(text: str) -> Optional[int]:
     text_lower = text.strip().lower()
 
     # Check for single person indicators
-    single_indicators = ['me', 'myself', 'just me', 'one person', 'solo', 'alone']
-    if any(indicator in text_lower for indicator in single_indicators):
+    if any(indicator in text_lower for indicator in _SINGLE_GUEST_INDICATORS):
         return 1
 
     # Look for numeric digits first
-    numbers = re.findall(r'\d+', text)
-    for num_str in numbers:
-        try:
-            num = int(num_str)
-            if 1 <= num <= 10:  # Reasonable range for hotel guests
-                return num
-        except ValueError:
-            continue
+    match = _GUEST_COUNT_RE.search(text)
+    if match:
+        return int(match.group(1))
 
     # Look for written numbers
-    word_to_num = {
-        'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-        'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-        'a': 1, 'an': 1, 'single': 1, 'couple': 2, 'pair': 2
-    }
-
-    words = text_lower.split()
-    for word in words:
-        clean_word = word.strip('.,!?;:"()[]{}')
-        if clean_word in word_to_num:
-            return word_to_num[clean_word]
-
-    # Use fuzzy matching for number words
-    for word in words:
-        clean_word = word.strip('.,!?;:"()[]{}')
-        for num_word, num_val in word_to_num.items():
-            if fuzz.ratio(clean_word, num_word) >= 80:
-                return num_val
+    words = [word.strip(_PUNCT) for word in text_lower.split()]
+    for clean_word in words:
+        if clean_word in _WORD_TO_NUM:
+            return _WORD_TO_NUM[clean_word]
+
+    # Use fuzzy matching for number words (short replies only, e.g. "thre people")
+    if len(words) <= _GUEST_FUZZY_MAX_WORDS:
+        for clean_word in words:
+            match = process.extractOne(clean_word, _WORD_TO_NUM_KEYS, scorer=fuzz.ratio, score_cutoff=80)
+            if match:
+                return _WORD_TO_NUM[match[0]]
 
     return None
 
@@ -248,9 +332,7 @@ def validate_date_order(checkin_str: str, checkout_str: str) -> bool:
     Returns:
         True if checkout > checkin, False otherwise
     """
-    try:
-        checkin = datetime.strptime(checkin_str, '%Y-%m-%d').date()
-        checkout = datetime.strptime(checkout_str, '%Y-%m-%d').date()
-        return checkout > checkin
-    except ValueError:
-        return False
\ No newline at end of file
+    # Zero-padded ISO dates compare correctly as plain strings
+    if not (_ISO_DATE_RE.fullmatch(checkin_str) and _ISO_DATE_RE.fullmatch(checkout_str)):
+        return False
+    return checkout_str > checkin_str
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Tests for the batched booking writer in app.py.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+# app.py opens bookings.db in the working directory on import, so point it at a scratch dir
+_TMP_DIR = tempfile.TemporaryDirectory()
+_OLD_CWD = os.getcwd()
+os.chdir(_TMP_DIR.name)
+try:
+    import app
+finally:
+    os.chdir(_OLD_CWD)
+
+
+def _booking(name='Test Guest'):
+    return {
+        'name': name,
+        'checkin_date': '2024-01-15',
+        'checkout_date': '2024-01-18',
+        'guests': 2,
+        'breakfast': True,
+        'payment_method': 'Credit Card'
+    }
+
+
+def _count_bookings():
+    return app._CONN.execute('SELECT COUNT(*) FROM bookings').fetchone()[0]
+
+
+class BookingWriterTests(unittest.TestCase):
+
+    def test_batch_commits_good_rows_when_one_fails(self):
+        before = _count_bookings()
+        batch = [(f'session-{i}', _booking(f'Guest {i}'), Future()) for i in range(10)]
+        # NOT NULL violation on name fails the grouped transaction
+        batch[4] = ('session-4', _booking(None), Future())
+
+        with app._DB_LOCK:
+            app._write_booking_batch(batch)
+
+        for i, (session_id, _, future) in enumerate(batch):
+            if i == 4:
+                self.assertIsInstance(future.exception(timeout=0), sqlite3.IntegrityError)
+            else:
+                record = future.result(timeout=0)
+                self.assertEqual(record['session_id'], session_id)
+                self.assertEqual(record['name'], f'Guest {i}')
+        self.assertEqual(_count_bookings(), before + 9)
+        self.assertFalse(app._CONN.in_transaction)
+
+    def test_batch_commits_all_rows_together(self):
+        before = _count_bookings()
+        batch = [(f'session-{i}', _booking(), Future()) for i in range(5)]
+
+        with app._DB_LOCK:
+            app._write_booking_batch(batch)
+
+        ids = [future.result(timeout=0)['id'] for _, _, future in batch]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual(_count_bookings(), before + 5)
+
+    def test_writer_keeps_running_after_an_error(self):
+        real_write = app._write_booking_batch
+        calls = []
+
+        def fail_once(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise RuntimeError('boom')
+            real_write(batch)
+
+        with mock.patch.object(app, '_write_booking_batch', side_effect=fail_once):
+            with self.assertRaises(RuntimeError):
+                app.save_booking_to_db('session-err', _booking())
+            record = app.save_booking_to_db('session-ok', _booking())
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(record['session_id'], 'session-ok')
+
+    def test_timed_out_booking_is_not_saved(self):
+        before = _count_bookings()
+        with mock.patch.object(app, 'BOOKING_WRITE_TIMEOUT', 0.2):
+            # Holding the lock keeps the writer from starting on the booking
+            with app._DB_LOCK:
+                with self.assertRaises(TimeoutError):
+                    app.save_booking_to_db('session-timeout', _booking())
+
+        # The writer handles bookings in order, so once this one is saved the
+        # withdrawn one has been skipped
+        app.save_booking_to_db('session-after', _booking())
+        self.assertEqual(_count_bookings(), before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()